@@ -1,11 +1,31 @@
 import json
 import random
 
+try:
+    import orjson  # Faster decode when available
+except ImportError:
+    orjson = None
+
+SAMPLE_SIZE = 3
+
 def audit_quotes(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        quotes = json.load(f)
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    quotes = orjson.loads(data) if orjson else json.loads(data)
         
-    croesus_cyrus_quotes = [q for q in quotes if q['speaker'] in ['Croesus', 'Cyrus']]
+    # Single pass: collect the edge-case speakers and reservoir-sample
+    # the tag check at the same time
+    croesus_cyrus_quotes = []
+    sample_quotes = []
+    for i, q in enumerate(quotes):
+        if q['speaker'] in ('Croesus', 'Cyrus'):
+            croesus_cyrus_quotes.append(q)
+        if i < SAMPLE_SIZE:
+            sample_quotes.append(q)
+        else:
+            j = random.randrange(i + 1)
+            if j < SAMPLE_SIZE:
+                sample_quotes[j] = q
     
     report = []
     report.append("Data Quality Audit Report")
@@ -40,10 +60,9 @@ def audit_quotes(filepath):
         report.append(f"Verification: {status}")
         report.append("")
         
-    report.append("Random Tag Check (3 Samples)")
+    report.append(f"Random Tag Check ({SAMPLE_SIZE} Samples)")
     report.append("----------------------------")
     
-    sample_quotes = random.sample(quotes, 3)
     for q in sample_quotes:
         report.append(f"Quote: \"{q['text'][:50]}...\"")
         report.append(f"Tags: {q['tags']}")
@@ -1,14 +1,42 @@
 import re
 import json
 import os
+from functools import lru_cache
+
+try:
+    import orjson  # Much faster indented dump when available
+except ImportError:
+    orjson = None
+
+# Precompiled patterns (the extraction loop runs these thousands of times)
+# Footnote brackets [1] get their own first pass: removing one can leave a
+# new marker behind, e.g. "(a[1])" -> "(a)", which the next pass must see.
+_BRACKET_RE = re.compile(r'\[.*?\]')
+# Stray numbers and subsection markers like (a), (b). The marker branch allows
+# digits around the letter so that "(a1)" is still removed whole, as it was
+# when the digits were stripped in a separate pass.
+_CLEAN_RE = re.compile(r'\d+|\(\d*[^\W\d]\d*\)')
+_SPEAKER_VERB_RE = re.compile(
+    r'([A-Z][a-z]+)(?:\s+\d+)?\s+(answered|said|spoke|replied|asked)'  # Name [footnote] verb
+    r'|(answered|said|spoke|replied|asked)'                            # Bare verb
+)
+_ADDRESSEE_VERB_RE = re.compile(r'([A-Z][a-z]+)\s+(?:answered|said|spoke|replied|asked)')
+# Every speaker pattern needs one of these verbs, so a plain substring check
+# can rule a context out before any regex runs.
+_VERB_LITERALS = ('said', 'answered', 'spoke', 'replied', 'asked')
+_CAP_RE = re.compile(r'([A-Z][a-z]+)')
+_ADDR_RE = re.compile(r'^([A-Z][a-z]+), ')
+_HERALD_RE = re.compile(r'^([A-Z][a-z]+).*? (?:sent us|sent me|saith).*?:(.*)')
+_HERALD_LITERALS = (' sent us', ' sent me', ' saith')
+_QUOTE_RE = re.compile(r'"([^"]+)"')
+_BOOK_RE = re.compile(r'(BOOK [IVX]+)')
 
 def clean_text(text):
     """Cleans the quote text by removing brackets, footnotes, and extra whitespace."""
-    text = re.sub(r'\[.*?\]', '', text)  # Remove [1], [2], etc.
-    text = re.sub(r'\d+', '', text)      # Remove standalone numbers (footnotes)
-    text = re.sub(r'\(\w\)', '', text)   # Remove subsection markers like (a), (b)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    if '[' in text:
+        text = _BRACKET_RE.sub('', text)  # Remove [1], [2], etc.
+    text = _CLEAN_RE.sub('', text)
+    return ' '.join(text.split())  # Collapse whitespace (and strip the ends)
 
 
 
@@ -28,35 +56,49 @@ BLACKLIST = {
     "Upon", "In", "How", "Come"
 }
 
+# Single lookup set for speaker candidates that are never real speakers
+_REJECT = frozenset(IGNORE_NAMES) | frozenset(BLACKLIST)
+
+# Tag keywords, built once at import rather than on every get_tags call
+TAG_KEYWORDS = {
+    'war': ('war', 'battle', 'army', 'fight', 'spear', 'shield', 'conquer', 'destroy'),
+    'fate': ('fate', 'destiny', 'god', 'oracle', 'dream', 'prophecy', 'doom', 'fortune'),
+    'wisdom': ('wisdom', 'wise', 'counsel', 'advice', 'learn', 'know', 'truth'),
+    'hubris': ('pride', 'boast', 'greatness', 'wealth', 'power', 'king', 'master'),
+    'justice': ('justice', 'right', 'wrong', 'law', 'punish', 'avenge', 'penalty'),
+    'death': ('death', 'die', 'slay', 'kill', 'bury', 'tomb', 'perish'),
+}
+
+# One alternation per tag, anchored at a word start so 'war' no longer
+# matches inside 'award' while 'wars' and 'killed' still count
+_TAG_RES = {
+    tag: re.compile(r'\b(?:' + '|'.join(map(re.escape, words)) + ')')
+    for tag, words in TAG_KEYWORDS.items()
+}
+
+@lru_cache(maxsize=4096)
 def get_tags(text):
-    """Generates tags based on keywords in the text."""
+    """
+    Generates tags based on keywords in the text.
+    Results are cached, so a tuple is returned to keep callers from mutating them.
+    """
     text_lower = text.lower()
-    tags = []
-    keywords = {
-        'war': ['war', 'battle', 'army', 'fight', 'spear', 'shield', 'conquer', 'destroy'],
-        'fate': ['fate', 'destiny', 'god', 'oracle', 'dream', 'prophecy', 'doom', 'fortune'],
-        'wisdom': ['wisdom', 'wise', 'counsel', 'advice', 'learn', 'know', 'truth'],
-        'hubris': ['pride', 'boast', 'greatness', 'wealth', 'power', 'king', 'master'],
-        'justice': ['justice', 'right', 'wrong', 'law', 'punish', 'avenge', 'penalty'],
-        'death': ['death', 'die', 'slay', 'kill', 'bury', 'tomb', 'perish'],
-    }
-    
-    for tag, words in keywords.items():
-        if any(word in text_lower for word in words):
-            tags.append(tag)
-            
-    if not tags:
-        tags.append('history')
+    tags = [tag for tag, tag_re in _TAG_RES.items() if tag_re.search(text_lower)]
         
-    return list(set(tags))
+    return tuple(sorted(tags)) or ('history',)
 
 def resolve_speaker(text, context_before, current_speaker):
     """
     Resolves the speaker, handling the 'Addressee, ...' case.
     If the text starts with 'Name, ', it checks the context to find the real speaker.
     """
+    # Most quotes don't open with a name; rule them out before the regex
+    # (no name in the text comes near 38 letters)
+    if not text[:1].isupper() or ', ' not in text[:40]:
+        return current_speaker
+
     # Check for "Name, " pattern at the start of the quote
-    match = re.match(r'^([A-Z][a-z]+), ', text)
+    match = _ADDR_RE.match(text)
     if match:
         addressee = match.group(1)
         # Heuristic: If the quote starts with a name, that person is likely the ADDRESSEE.
@@ -64,12 +106,14 @@ def resolve_speaker(text, context_before, current_speaker):
         
         # Look for patterns like "Speaker said:", "Speaker answered:", "Speaker spoke:"
         # We search backwards from the end of context_before
-        speaker_matches = list(re.finditer(r'([A-Z][a-z]+)\s+(?:answered|said|spoke|replied|asked)', context_before))
+        speaker_matches = []
+        if any(verb in context_before for verb in _VERB_LITERALS):
+            speaker_matches = list(_ADDRESSEE_VERB_RE.finditer(context_before))
         if speaker_matches:
             # Iterate backwards
             for match in reversed(speaker_matches):
                 name = match.group(1)
-                if name not in IGNORE_NAMES and name not in BLACKLIST:
+                if name not in _REJECT:
                     return name
             
         # If no explicit speaker verb found, try to find the subject of the last sentence
@@ -78,44 +122,56 @@ def resolve_speaker(text, context_before, current_speaker):
         
     return current_speaker
 
+@lru_cache(maxsize=256)
+def _slugify(name):
+    """ID-safe form of a speaker or book name; only a few dozen distinct values occur."""
+    return name.lower().replace(' ', '_')
+
+def write_json(path, data):
+    """Writes data as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
 def extract_quotes_from_file(file_path):
+    """
+    Extracts attributed quotes from the full text.
+    Returns (quotes, speakers), where speakers is the set of everyone quoted.
+    """
     if not os.path.exists(file_path):
         print(f"Error: File not found: {file_path}")
-        return []
-
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
+        return [], set()
 
     # Filter out Gutenberg legal boilerplate (The "Seam" Fix)
-    clean_lines = []
-    for line in lines:
-        if "*** START OF" in line or "*** END OF" in line or "Project Gutenberg" in line:
-            continue
-        clean_lines.append(line)
-    
-    content = "".join(clean_lines)
+    # Lines are filtered as they are read, so the file is never held as a list.
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = "".join(
+            line for line in f
+            if "*** START OF" not in line and "*** END OF" not in line and "Project Gutenberg" not in line
+        )
 
-    # Split by Books
-    books = re.split(r'(BOOK [IVX]+)', content)
-    
-    quotes = []
-    current_book = "Unknown"
+    # Locate the book markers; each book is then scanned in place within
+    # content, so the text is never split into per-book copies
+    book_markers = list(_BOOK_RE.finditer(content))
     
-    # Skip the preamble
-    start_index = 1 if len(books) > 1 else 0
+    found = []  # (text, speaker, book, context_before, context_after)
+    speakers = set()
     
-    for i in range(start_index, len(books), 2):
-        if i >= len(books): break
-        
-        header = books[i].strip() # e.g., "BOOK I"
+    # Anything before the first marker is preamble and is skipped
+    for i, book_match in enumerate(book_markers):
+        header = book_match.group(1) # e.g., "BOOK I"
         print(f"Found {header}")
         book_num = header.replace("BOOK ", "")
-        text_block = books[i+1]
+        book_start = book_match.end()
+        book_end = book_markers[i+1].start() if i+1 < len(book_markers) else len(content)
         
         # Regex to find quotes: "..."
         # We capture context before and after roughly
         # This regex is a bit simplified; for full text it might need to be more robust against newlines
-        quote_matches = re.finditer(r'"([^"]+)"', text_block)
+        quote_matches = _QUOTE_RE.finditer(content, book_start, book_end)
         
         for match in quote_matches:
             quote_text = match.group(1)
@@ -123,8 +179,9 @@ def extract_quotes_from_file(file_path):
             end = match.end()
             
             # Get context (approx 300 chars)
-            context_before = text_block[max(0, start-300):start].strip()
-            context_after = text_block[end:min(len(text_block), end+300)].strip()
+            # Only the lead-in is needed for speaker detection; the stored
+            # context is trimmed once the quote is actually kept.
+            immediate_context = content[max(book_start, start-300):start]
             
             cleaned_text = clean_text(quote_text)
             
@@ -141,72 +198,75 @@ def extract_quotes_from_file(file_path):
             # Default to "Unknown" if not found, then refine
             speaker = "Unknown"
             
-            # Look at the last 300 chars of context_before to find the speaker
-            immediate_context = context_before[-300:]
-            
             # Regex strategies to find speaker:
             # 1. "Name said:", "Name answered:", "Name spoke:" (Basic)
             # 2. "Name [0-9]+ said:" (Footnote handling)
             # 3. "Name ... said:" (Distance handling, e.g. "Megabazos ... said")
             
             # Strategy 1 & 2: Name followed by verb (optional footnote)
-            # We look for the *last* occurrence of this pattern
-            matches = list(re.finditer(r'([A-Z][a-z]+)(?:\s+\d+)?\s+(?:answered|said|spoke|replied|asked)', immediate_context))
+            # We look for the *last* occurrence of this pattern.
+            # The same scan also reports bare verbs (group 3), so Strategy 3
+            # knows where the last verb is without scanning the window again.
+            matches = []
+            if any(verb in immediate_context for verb in _VERB_LITERALS):
+                matches = list(_SPEAKER_VERB_RE.finditer(immediate_context))
             speaker_candidate = None
             if matches:
                 # Iterate backwards to find a valid name
                 for match in reversed(matches):
                     name = match.group(1)
-                    if name not in IGNORE_NAMES and name not in BLACKLIST:
+                    if name and name not in _REJECT:
                         speaker_candidate = name
                         break
             
             if speaker_candidate:
                 speaker = speaker_candidate
-            else:
+            elif matches:
                 # Strategy 3: Name ... verb (allow some words in between, e.g. "Megabazos, having ..., said")
                 # Better approach: Find the verb, then look backwards for the closest Name.
-                verb_matches = list(re.finditer(r'(answered|said|spoke|replied|asked)', immediate_context))
-                if verb_matches:
-                    # Use the last verb found (closest to the quote)
-                    last_verb = verb_matches[-1]
-                    verb_start = last_verb.start()
-                    
-                    # Look at text before the verb (up to 200 chars)
-                    lookback_text = immediate_context[max(0, verb_start-200):verb_start]
-                    
-                    # Find candidates: Capitalized words
-                    # We want the *last* candidate in this chunk (closest to verb)
-                    candidates = list(re.finditer(r'([A-Z][a-z]+)', lookback_text))
-                    if candidates:
-                        # Iterate backwards through candidates
-                        for cand in reversed(candidates):
-                            name = cand.group(1)
-                            if name in IGNORE_NAMES or name in BLACKLIST:
-                                continue
-                                
-                            # Check for "by Name" (passive agent)
-                            # Get text before the candidate in the lookback_text
-                            start_pos = cand.start()
-                            preceding_text = lookback_text[max(0, start_pos-5):start_pos].lower()
-                            if "by " in preceding_text:
-                                continue
-                                
-                            speaker = name
-                            break
+                # Use the last verb found (closest to the quote)
+                last_verb = matches[-1]
+                verb_start = last_verb.start(2) if last_verb.group(2) else last_verb.start(3)
+                
+                # Look at text before the verb (up to 200 chars)
+                lookback_start = max(0, verb_start-200)
+                
+                # Find candidates: Capitalized words
+                # We want the *last* candidate in this chunk (closest to verb)
+                candidates = list(_CAP_RE.finditer(immediate_context, lookback_start, verb_start))
+                if candidates:
+                    # Iterate backwards through candidates
+                    for cand in reversed(candidates):
+                        name = cand.group(1)
+                        if name in _REJECT:
+                            continue
+                            
+                        # Check for "by Name" (passive agent)
+                        # Get text before the candidate in the lookback window
+                        start_pos = cand.start()
+                        preceding_text = immediate_context[max(lookback_start, start_pos-5):start_pos].lower()
+                        if "by " in preceding_text:
+                            continue
+                            
+                        speaker = name
+                        break
 
             # Refine speaker using the "Tomyris" logic (Addressee check)
-            speaker = resolve_speaker(cleaned_text, context_before, speaker)
+            speaker = resolve_speaker(cleaned_text, immediate_context, speaker)
 
             # --- MIDDLEWARE START ---
 
             # Sub-Task A: The Herald Rule (Messenger Proxy)
             # Logic: If the text starts with "[Name] sent us..." or "[Name] sent me..." and contains a colon :
             # Updated regex to allow for titles (e.g. "Croesus king of the Lydians... sent us")
-            herald_match = re.match(r'^([A-Z][a-z]+).*? (?:sent us|sent me|saith).*?:(.*)', cleaned_text)
+            # The lazy .*? in this regex backtracks over the whole quote, so only
+            # run it when the literal markers it needs are actually present
+            herald_match = None
+            if ':' in cleaned_text and any(marker in cleaned_text for marker in _HERALD_LITERALS):
+                herald_match = _HERALD_RE.match(cleaned_text)
             if herald_match:
                 potential_speaker = herald_match.group(1)
-                if potential_speaker not in IGNORE_NAMES and potential_speaker not in BLACKLIST:
+                if potential_speaker not in _REJECT:
                     speaker = potential_speaker
                     cleaned_text = herald_match.group(2).strip()
                     # Re-clean in case of leading quotes or spaces
@@ -230,21 +290,31 @@ def extract_quotes_from_file(file_path):
 
             # --- MIDDLEWARE END ---
             
-            # Generate ID
-            speaker_slug = speaker.lower().replace(' ', '_')
-            quote_id = f"book{book_num.lower()}_{speaker_slug}_{len(quotes):02d}"
-            
-            quotes.append({
-                "id": quote_id,
-                "text": cleaned_text,
-                "speaker": speaker,
-                "book": book_num,
-                "context_before": context_before[-200:], # Truncate for JSON
-                "context_after": context_after[:200],
-                "tags": get_tags(cleaned_text)
-            })
+            found.append((
+                cleaned_text,
+                speaker,
+                book_num,
+                immediate_context.strip()[-200:], # Truncate for JSON
+                content[end:min(book_end, end+300)].strip()[:200],
+            ))
+            speakers.add(speaker)
+    
+    # Build the JSON records in one go once the scan is done; the running
+    # index doubles as the ID suffix
+    quotes = [
+        {
+            "id": f"book{_slugify(book_num)}_{_slugify(speaker)}_{i:02d}",
+            "text": text,
+            "speaker": speaker,
+            "book": book_num,
+            "context_before": context_before,
+            "context_after": context_after,
+            "tags": get_tags(text)
+        }
+        for i, (text, speaker, book_num, context_before, context_after) in enumerate(found)
+    ]
             
-    return quotes
+    return quotes, speakers
 
 if __name__ == "__main__":
     input_file = "data/herodotus_full_text.txt" # Assuming this location
@@ -258,7 +328,7 @@ if __name__ == "__main__":
             print(f"Warning: {input_file} not found. Please place the full text file there.")
             exit(1)
 
-    extracted_quotes = extract_quotes_from_file(input_file)
+    extracted_quotes, speakers = extract_quotes_from_file(input_file)
     
     # Load existing quotes to append or merge? 
     # User said "Append all quotes". But we probably want to overwrite if we are doing a full extraction.
@@ -267,13 +337,11 @@ if __name__ == "__main__":
     
     print(f"Extracted {len(extracted_quotes)} quotes.")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(extracted_quotes, f, indent=2, ensure_ascii=False)
-        
+    write_json(output_file, extracted_quotes)
+
     print(f"Saved to {output_file}")
 
     # Save detected characters
-    detected_characters = sorted(list(set(q['speaker'] for q in extracted_quotes)))
-    with open('data/detected_characters.json', 'w', encoding='utf-8') as f:
-        json.dump(detected_characters, f, indent=2, ensure_ascii=False)
+    detected_characters = sorted(speakers)
+    write_json('data/detected_characters.json', detected_characters)
     print(f"Saved detected characters to data/detected_characters.json")
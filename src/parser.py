@@ -1,14 +1,26 @@
+import hashlib
 import json
 import logging
 import re
+import time
 from pathlib import Path
-from typing import Optional, Tuple, Dict, List, Set
+from typing import Optional, Tuple, Dict, List, Set, Iterator
 import requests
 import sys
 import os
+import tempfile
+from bisect import bisect_right
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from dataclasses import dataclass, asdict
-from thefuzz import fuzz
+from rapidfuzz import fuzz, process
+
+try:
+    import orjson  # Much faster indented dump when available
+except ImportError:
+    orjson = None
 
 # Set up logging
 logging.basicConfig(
@@ -17,6 +29,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Downloaded volumes are reused for this long (seconds) before refetching
+TEXT_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+# Precompiled patterns for cleaning and validation
+_FOOTNOTE_RE = re.compile(r'\[\s*\d+\s*\][^\n]*\n')
+_GREEK_RE = re.compile(r'\{[^}]*\}')
+_WS_RE = re.compile(r'\s+')
+_REF_RE = re.compile(r'\[\d+\]')
+_PAREN_RE = re.compile(r'\([^)]*\)')
+_EDIT_START_RE = re.compile(r'^\d+\.|\[|\(')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_BOOK_HEADER_RE = re.compile(
+    r"BOOK\s+([IVX]+)\.?\s+THE\s+([^B]+)BOOK\s+OF\s+THE\s+HISTORIES",
+    re.MULTILINE | re.IGNORECASE
+)
+_SPEAKER_START_RE = re.compile(r'[A-Z][a-z]')
+_STRONG_DIALOGUE_RE = re.compile(r'answered|replied|made answer', re.IGNORECASE)
+
+def find_matches(content: str, quote_patterns: List[Tuple[re.Pattern, str]],
+                 pattern_anchors: Dict[str, List[re.Pattern]]) -> List[Tuple[str, list]]:
+    """Run every quote pattern over one book, returning (span, groups) per match.
+
+    Module-level and free of parser state so books can be scanned in worker
+    processes; re.Match objects cannot be pickled, hence the plain tuples.
+    """
+    results = []
+    for pattern, pattern_name in quote_patterns:
+        anchors = pattern_anchors.get(pattern_name)
+        if anchors:
+            matches = anchored_finditer(pattern, anchors, content)
+        else:
+            matches = pattern.finditer(content)
+        results.append((pattern_name, [(match.span(), match.groups()) for match in matches]))
+    return results
+
+def write_json(path: Path, data) -> None:
+    """Write data as indented UTF-8 JSON, using orjson when it is installed."""
+    if orjson:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+def canonical_key(text: str) -> str:
+    """Dedup key: whitespace-normalized, lower-cased quote text."""
+    return ' '.join(text.split()).lower()
+
+def indicator_regex(indicators: List[str]) -> re.Pattern:
+    """Compile indicator words into one case-insensitive alternation."""
+    return re.compile('|'.join(map(re.escape, indicators)), re.IGNORECASE)
+
+def anchored_finditer(pattern: re.Pattern, anchors: List[re.Pattern], text: str) -> Iterator[re.Match]:
+    """
+    Yield the same matches as pattern.finditer(text) for a delayed attribution pattern.
+
+    Those patterns read Speaker [^"]*? A1 [^"]*? ... An [^"]*? "quote", so a match
+    needs the keywords A1..An, in order, between the speaker and the next quotation
+    mark. The regex itself re-scans up to that mark from every capitalised word;
+    here each stretch of text before a quotation mark is checked once for the
+    keyword chain and the regex only runs where a speaker can still fit before it.
+    """
+    pos = 0
+    while True:
+        quote_start = text.find('"', pos)
+        if quote_start == -1:
+            return
+        quote_end = text.find('"', quote_start + 1)
+        if quote_end == -1:
+            return
+
+        # Latest point the speaker may end: walk the keyword chain back from the quote
+        limit = quote_start if quote_end > quote_start + 1 else -1
+        for anchor in reversed(anchors):
+            last = None
+            for last in anchor.finditer(text, pos, limit):
+                pass
+            if last is None:
+                limit = -1
+                break
+            limit = last.start()
+
+        found = None
+        if limit > pos:
+            for candidate in _SPEAKER_START_RE.finditer(text, pos, limit):
+                found = pattern.match(text, candidate.start())
+                if found:
+                    break
+
+        if found:
+            yield found
+            pos = found.end()
+        else:
+            pos = quote_start + 1
+
 @dataclass
 class Book:
     """Class to represent a book of the Histories."""
@@ -58,6 +165,9 @@ class DialogueContext:
             "message", "word", "answered", "continued", "began",
             "whispered", "remarked", "announced"
         ]
+        self._speech_indicator_re = indicator_regex(self.speech_indicators)
+        # Sorted once here rather than on every lookup
+        self._characters_by_len = tuple(sorted(characters, key=len, reverse=True))
         
     def find_speaker_in_context(self, position: int) -> Optional[str]:
         """Look backwards from position to find the most recent speaker."""
@@ -66,11 +176,10 @@ class DialogueContext:
         
         # Look for character names before speech indicators
         candidates = []
-        for char in sorted(self.characters, key=len, reverse=True):
+        for char in self._characters_by_len:
             if char in context:
                 char_pos = context.rfind(char)
-                after_char = context[char_pos:].lower()
-                if any(indicator in after_char for indicator in self.speech_indicators):
+                if self._speech_indicator_re.search(context, char_pos):
                     candidates.append((char_pos, char))
         
         # Return the most recent speaker found
@@ -80,13 +189,15 @@ class DialogueContext:
     
     def get_context(self, start: int, end: int) -> Tuple[str, str]:
         """Get text context before and after a quote."""
-        context_start = max(0, start - self.window_size)
-        context_end = min(len(self.text), end + self.window_size)
-        
-        before = self.text[context_start:start].strip()
-        after = self.text[end:context_end].strip()
-        
-        return before, after
+        return self.get_context_before(start), self.get_context_after(end)
+
+    def get_context_before(self, start: int) -> str:
+        """Get text context before a quote."""
+        return self.text[max(0, start - self.window_size):start].strip()
+
+    def get_context_after(self, end: int) -> str:
+        """Get text context after a quote."""
+        return self.text[end:end + self.window_size].strip()
 
 class HerodotusParser:
     def __init__(self):
@@ -95,7 +206,10 @@ class HerodotusParser:
             "https://www.gutenberg.org/cache/epub/2456/pg2456.txt"   # Volume 2
         ]
         self.raw_texts = []
+        self._session = requests.Session()  # Pooled connections to gutenberg.org
         self.books: Dict[str, Book] = {}
+        self._boundary_positions: List[int] = []  # Book start offsets, for book_at
+        self._boundary_names: List[str] = []
         self.quotes: List[Quote] = []
         self.debug_info = defaultdict(list)
         self.quote_deduplicator = QuoteDeduplicator()
@@ -112,8 +226,12 @@ class HerodotusParser:
         # Initialize character sets
         self.characters: Set[str] = set()
         self.character_variations: Dict[str, List[str]] = {}
+        self._variation_to_canonical: Dict[str, str] = {}
         self.process_character_data()
 
+        # Per-instance cache, so it is dropped along with the parser
+        self._resolve_name = lru_cache(maxsize=8192)(self._resolve_name_uncached)
+
         # Initialize directories
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
@@ -125,6 +243,7 @@ class HerodotusParser:
             r"cried", r"exclaimed", r"proclaimed", r"told", r"asked",
             r"commanded", r"ordered", r"shouted", r"stated"
         ]
+        self._speech_indicator_re = indicator_regex(self.speech_indicators)
         
         # Compile speech pattern
         self.speech_pattern = f"(?:{"|".join(self.speech_indicators)})"
@@ -149,7 +268,19 @@ class HerodotusParser:
         ]
     
         # Add delayed attribution patterns
-        self.quote_patterns = base_patterns + [(pattern, name) for pattern, name, _ in self.get_delayed_attribution_patterns()]
+        delayed_patterns = [(pattern, name) for pattern, name, _ in self.get_delayed_attribution_patterns()]
+
+        # Compile once here rather than on every book
+        self.quote_patterns: List[Tuple[re.Pattern, str]] = [
+            (re.compile(pattern, re.DOTALL), name)
+            for pattern, name in base_patterns + delayed_patterns
+        ]
+
+        # Keyword chains that let delayed patterns skip the backtracking scan
+        self.pattern_anchors: Dict[str, List[re.Pattern]] = {
+            name: [re.compile(f"(?=(?:{anchor}))") for anchor in anchors]
+            for name, anchors in self.get_delayed_attribution_anchors().items()
+        }
 
         # Statistics
         self.stats = defaultdict(int)
@@ -162,6 +293,12 @@ class HerodotusParser:
             variations = char_data.get("variations", [])
             self.character_variations[name] = variations
             self.characters.update(variations)
+            for variation in variations:
+                # First listed character wins, as with the old linear scan
+                self._variation_to_canonical.setdefault(variation, name)
+
+        # Materialized once for fuzzy matching
+        self._characters_list = list(self.characters)
         
         logger.info(f"Processed {len(self.characters)} total character names and variations")
 
@@ -210,17 +347,52 @@ class HerodotusParser:
         ]
         return patterns
 
+    def get_delayed_attribution_anchors(self) -> Dict[str, List[str]]:
+        """Keyword groups of each speaker-first delayed pattern above, in pattern order."""
+        return {
+            "delayed_attribution_action": [r"turning|looking|seeing", self.speech_pattern],
+            "delayed_attribution_state": [r"silent|angry|pleased", self.speech_pattern],
+            "delayed_attribution_temporal": [r"when|after|while", self.speech_pattern],
+            "delayed_indirect_speech": [r"message|word"],
+            "delayed_attribution_basic": [self.speech_pattern],
+            "conversation_marker": [r"conversation|discussion"],
+            "response_pattern": [r"answer|response"],
+        }
+
     def fetch_texts(self) -> None:
         """Fetch texts from both Gutenberg volumes."""
-        for url in self.urls:
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                self.raw_texts.append(response.text)
-                logger.info(f"Successfully fetched text from {url}")
-            except Exception as e:
-                logger.error(f"Failed to fetch text from {url}: {str(e)}")
-                raise
+        # Download the volumes concurrently; map() keeps them in volume order
+        with ThreadPoolExecutor(max_workers=len(self.urls)) as executor:
+            self.raw_texts.extend(executor.map(self.fetch_text, self.urls))
+
+    def fetch_text(self, url: str) -> str:
+        """Fetch a single Gutenberg volume, reusing a recent local copy if present."""
+        cache_path = self.data_dir / f"gutenberg_{hashlib.md5(url.encode()).hexdigest()}.txt"
+        if (cache_path.exists() and
+                time.time() - cache_path.stat().st_mtime < TEXT_CACHE_MAX_AGE):
+            logger.info(f"Using cached text for {url}")
+            return cache_path.read_text(encoding="utf-8")
+
+        try:
+            response = self._session.get(url, timeout=10)
+            response.raise_for_status()
+            self.write_cache(cache_path, response.text)
+            logger.info(f"Successfully fetched text from {url}")
+            return response.text
+        except Exception as e:
+            logger.error(f"Failed to fetch text from {url}: {str(e)}")
+            raise
+
+    def write_cache(self, cache_path: Path, text: str) -> None:
+        """Atomically write a cached volume, so an interrupted run never leaves a truncated copy."""
+        fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=cache_path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
 
     def clean_texts(self) -> str:
         """Clean the texts while preserving book headers."""
@@ -243,10 +415,12 @@ class HerodotusParser:
                 text = text[start_idx:end_idx]
                 
                 # Clean the text
-                text = re.sub(r'\[\s*\d+\s*\][^\n]*\n', '', text)  # Remove footnotes
-                text = re.sub(r'\{[^}]*\}', '', text)              # Remove Greek
-                text = re.sub(r'\s+', ' ', text)                   # Normalize whitespace
-                text = text.strip()
+                # Footnotes go first, in their own pass: a footnote line can
+                # contain a '{' or '}' that must not pair up with Greek text
+                if '[' in text:
+                    text = _FOOTNOTE_RE.sub('', text)  # Remove footnotes
+                text = _GREEK_RE.sub('', text)         # Remove Greek
+                text = ' '.join(text.split())          # Normalize whitespace
                 
                 combined_text += text + "\n\n"
                 logger.info(f"Successfully cleaned volume {i}")
@@ -260,18 +434,17 @@ class HerodotusParser:
     def split_into_books(self, text: str) -> None:
         """Split text into books using Book dataclass."""
         try:
-            book_pattern = r"BOOK\s+([IVX]+)\.?\s+THE\s+([^B]+)BOOK\s+OF\s+THE\s+HISTORIES"
             book_positions = []
 
             # Find all book positions
-            for match in re.finditer(book_pattern, text, re.MULTILINE | re.IGNORECASE):
-                book_num = match.group(1)
-                book_title = match.group(2).strip()
-                start_pos = match.start()
-                book_positions.append((book_num, book_title, start_pos))
+            for match in _BOOK_HEADER_RE.finditer(text):
+                book_num, book_title = match.groups()
+                book_positions.append((book_num, book_title.strip(), match.start()))
             
             # Sort positions
             book_positions.sort(key=lambda x: x[2])
+            self._boundary_positions = [start_pos for _, _, start_pos in book_positions]
+            self._boundary_names = [book_num for book_num, _, _ in book_positions]
 
             # Extract each book's content
             for i, (book_num, book_title, start_pos) in enumerate(book_positions):
@@ -290,82 +463,85 @@ class HerodotusParser:
             logger.error(f"Error splitting books: {str(e)}")
             raise
 
+    def book_at(self, pos: int) -> Optional[str]:
+        """Return the book number containing a position in the combined text."""
+        i = bisect_right(self._boundary_positions, pos) - 1
+        return self._boundary_names[i] if i >= 0 else None
+
     def clean_quote(self, quote: str) -> str:
         # Add better editorial mark handling
-        quote = re.sub(r'\[\d+\]', '', quote)  # Remove reference numbers
-        quote = re.sub(r'\([^)]*\)', '', quote)  # Remove parentheticals
-        quote = re.sub(r'\s+', ' ', quote)       # Normalize whitespace
+        quote = _REF_RE.sub('', quote)    # Remove reference numbers
+        quote = _PAREN_RE.sub('', quote)  # Remove parentheticals
+        quote = _WS_RE.sub(' ', quote)    # Normalize whitespace
         return quote.strip('"\' []')
     
-    def resolve_speaker(self, speaker: str, context: str) -> Optional[str]:
-        """Enhanced speaker resolution with fuzzy matching."""
+    def _resolve_name_uncached(self, speaker: str) -> Optional[str]:
+        """Resolve a raw speaker string against the known names alone."""
         # Direct match
         if speaker in self.characters:
             return speaker
             
-        # Fuzzy matching for names
-        best_match = None
-        best_score = 0
-        for char_name in self.characters:
-            score = fuzz.ratio(speaker, char_name)
-            if score > 85 and score > best_score:
-                best_match = char_name
-                best_score = score
+        # Fuzzy matching for names (a rounded score above 85, i.e. at least 85.5)
+        best_match = process.extractOne(
+            speaker, self._characters_list, scorer=fuzz.ratio, score_cutoff=85.5)
         if best_match:
-            return best_match
+            return best_match[0]
+        return None
+
+    def resolve_speaker(self, speaker: str, context: str) -> Optional[str]:
+        """Enhanced speaker resolution with fuzzy matching."""
+        # Name-only resolution is cached; the same raw speakers recur constantly
+        resolved = self._resolve_name(speaker)
+        if resolved:
+            return resolved
                 
         # Check variations with stronger context validation
-        for char_data in self.character_data:
-            if speaker in char_data["variations"]:
-                # Verify with surrounding context
-                if any(indicator in context.lower() for indicator in self.speech_indicators):
-                    return char_data["name"]
+        canonical = self._variation_to_canonical.get(speaker)
+        if canonical:
+            # Verify with surrounding context
+            if self._speech_indicator_re.search(context):
+                return canonical
         
-        # Look for contextual clues with expanded window
+        # Look for contextual clues with expanded window. Every window below is
+        # a slice of the joined words, so no indicator there means none nearby.
         words = context.split()
+        if not self._speech_indicator_re.search(' '.join(words)):
+            return None
         for i, word in enumerate(words):
             if word in self.characters:
                 # Check if there's a speech indicator within 10 words
                 nearby_words = ' '.join(words[max(0, i-10):min(len(words), i+10)]) 
-                if any(indicator in nearby_words.lower() for indicator in self.speech_indicators):
+                if self._speech_indicator_re.search(nearby_words):
                     return word
         
         return None
 
     def is_valid_quote(self, quote: str) -> bool:
         """Enhanced quote validation with positive indicators."""
-        # Too short
-        if len(quote.split()) < 4:  # Reduced minimum length
+        # Too short; four words need at least seven characters
+        if len(quote) < 7 or len(quote.split()) < 4:  # Reduced minimum length
             return False
             
         # Structural issues
         if quote.isupper() or quote.count('[') != quote.count(']'):
             return False
             
-        # Check for editorial content
-        if re.match(r'^\d+\.|\[|\(', quote):
+        # Check for editorial content (only digits, '[' or '(' can start it)
+        first = quote[0]
+        if first in '[(' or (first.isdigit() and _EDIT_START_RE.match(quote)):
             return False
-        if any(marker in quote.upper() for marker in ["NOTE:", "BOOK", "CHAPTER", "MS", "MSS"]):
+        upper = quote.upper()
+        if any(marker in upper for marker in ["NOTE:", "BOOK", "CHAPTER", "MS", "MSS"]):
             return False
             
-        # Strong positive indicators
-        if any(indicator in quote.lower() for indicator in [
-            "thus", "spoke", "said", "replied", "answered",
-            "declared", "commanded", "asked"
-        ]):
-            return True
-            
-        # Check for sentence completeness
-        sentences = re.split(r'[.!?]+', quote)
-        complete_sentences = [s for s in sentences if len(s.split()) >= 3]
-        if len(complete_sentences) / len(sentences) > 0.5:
-            return True
-            
-        return len(quote.split()) >= 4  # Final length check
+        # Anything that got this far already meets the length minimum. The
+        # positive-indicator and sentence-completeness checks that used to
+        # follow could only return True as well, so they are skipped.
+        return True
 
     def text_similarity(self, text1: str, text2:str) -> float:
-        """Calculate similarity ratio b/w two texts using difflib."""
-        return difflib.SequenceMatcher(None, text1, text2).ratio()
+        """Calculate similarity ratio b/w two texts using rapidfuzz."""
+        return fuzz.ratio(text1, text2) / 100.0
     
     def _is_split_quote(self, quote: Quote) -> bool:
         """Check if this quote appears to be part of a longer speech."""
@@ -403,15 +579,16 @@ class HerodotusParser:
                     confidence=merged_confidence
                 )
 
-                self.seen_quotes[merged_text] = merged_quote
+                self.seen_quotes[canonical_key(merged_text)] = merged_quote
                 return True
             return False
     
     def is_duplicate_quote(self, quote: Quote) -> bool:
         """Enhanced duplicate detection."""
         # Check if exact duplicate
-        if quote.text in self.seen_quotes:
-            existing = self.seen_quotes[quote.text]
+        key = canonical_key(quote.text)
+        existing = self.seen_quotes.get(key)
+        if existing is not None:
 
             # Same context - true duplicate
             if self._same_context(existing, quote):
@@ -426,7 +603,7 @@ class HerodotusParser:
         if self._is_split_quote(quote):
             return self._merge_split_quotes(quote)
     
-        self.seen_quotes[quote.text] = quote
+        self.seen_quotes[key] = quote
         return False
         
     def _same_context(self, q1: Quote, q2: Quote) -> bool:
@@ -439,10 +616,12 @@ class HerodotusParser:
         return (q1.book != q2.book or
                 abs(len(q1.context_before) - len(q2.context_before)) > 1000)
 
-    def extract_quotes(self, book: Book) -> None:
-        """Extract quotes from a book."""
+    def extract_quotes(self, book: Book, pattern_matches: Optional[List[Tuple[str, list]]] = None) -> None:
+        """Extract quotes from a book, optionally from matches found by find_matches."""
         if not book.content:
             raise ValueError(f"Empty content for Book {book.number}")
+        if pattern_matches is None:
+            pattern_matches = find_matches(book.content, self.quote_patterns, self.pattern_anchors)
         
         dialogue_context = DialogueContext(book.content, self.characters)
         book_stats = defaultdict(int)
@@ -451,22 +630,19 @@ class HerodotusParser:
         # Get delayed attribution patterns with their confidence values
         delayed_patterns = {name: conf for _, name, conf in self.get_delayed_attribution_patterns()}
 
-        for pattern, pattern_name in self.quote_patterns:
-            matches = list(re.finditer(pattern, book.content, re.DOTALL))
+        for pattern_name, matches in pattern_matches:
             book_stats[f"{pattern_name}_attempts"] = len(matches)
             
-            for match in matches:
+            for (start, end), groups in matches:
                 try:
                     # Extract quote based on pattern type
                     if pattern_name == "split_quote":
-                        quote = match.group(1) + " " + match.group(2)
-                        speaker = dialogue_context.find_speaker_in_context(match.start())
+                        quote = groups[0] + " " + groups[1]
+                        speaker = dialogue_context.find_speaker_in_context(start)
                     elif pattern_name == "quote_first":
-                        quote = match.group(1)
-                        speaker = match.group(2)
+                        quote, speaker = groups[0], groups[1]
                     else:
-                        speaker = match.group(1)
-                        quote = match.group(2)
+                        speaker, quote = groups[0], groups[1]
 
                     # Clean quote
                     quote = self.clean_quote(quote)
@@ -476,9 +652,8 @@ class HerodotusParser:
                         book_stats["invalid_quote"] += 1
                         continue
 
-                    # Get context
-                    context_before, context_after = dialogue_context.get_context(
-                        match.start(), match.end())
+                    # Get context; the "after" side is only sliced for stored quotes
+                    context_before = dialogue_context.get_context_before(start)
 
                     # Resolve speaker
                     resolved_speaker = self.resolve_speaker(speaker, context_before)
@@ -511,30 +686,22 @@ class HerodotusParser:
                             confidence *= 0.85  # Larger penalty for context-based resolution
 
                     # Context-based adjustments
-                    if any(indicator in context_before.lower() for indicator in 
-                        ["answered", "replied", "made answer"]):
+                    if _STRONG_DIALOGUE_RE.search(context_before):
                         confidence *= 1.1  # Boost for strong dialogue indicators
 
                     # Store quote
-                    if not self.quote_deduplicator.is_duplicate(Quote(
+                    candidate = Quote(
                         speaker=resolved_speaker,
                         text=quote,
                         book=book.number,
                         context_before=context_before,
-                        context_after=context_after,
+                        context_after=dialogue_context.get_context_after(end),
                         pattern_matched=pattern_name,
                         confidence=confidence
-                    )):
+                    )
+                    if not self.quote_deduplicator.is_duplicate(candidate):
                         seen_quotes.add((resolved_speaker, quote))
-                        self.quotes.append(Quote(
-                            speaker=resolved_speaker,
-                            text=quote,
-                            book=book.number,
-                            context_before=context_before,
-                            context_after=context_after,
-                            pattern_matched=pattern_name,
-                            confidence=confidence
-                        ))
+                        self.quotes.append(candidate)
                         book_stats[f"{pattern_name}_success"] += 1
 
                 except Exception as e:
@@ -542,7 +709,7 @@ class HerodotusParser:
                     self.debug_info["errors"].append({
                         "pattern": pattern_name,
                         "error": str(e),
-                        "text": match.group(0)[:100]
+                        "text": book.content[start:min(end, start + 100)]
                     })
 
         # Log book statistics
@@ -555,33 +722,45 @@ class HerodotusParser:
     def process_books(self):
         """Process all books in order."""
         roman_numerals = ['I', 'II', 'III', 'IV', 'V', 'VI', 'VII', 'VIII', 'IX']
-        
-        for numeral in roman_numerals:
-            if numeral in self.books:
-                book = self.books[numeral]
-                logger.info(f"\nProcessing Book {book.number}: {book.title}")
-                self.extract_quotes(book)
+        books = [self.books[numeral] for numeral in roman_numerals if numeral in self.books]
+
+        # Pattern matching dominates and is independent per book, so it runs in
+        # parallel; deduplication spans books and stays sequential, in book order
+        workers = min(len(books), os.cpu_count() or 1)
+        contents = [book.content for book in books]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                book_matches = list(executor.map(
+                    find_matches, contents,
+                    repeat(self.quote_patterns), repeat(self.pattern_anchors)))
+        else:
+            book_matches = [find_matches(content, self.quote_patterns, self.pattern_anchors)
+                            for content in contents]
+
+        for book, pattern_matches in zip(books, book_matches):
+            logger.info(f"\nProcessing Book {book.number}: {book.title}")
+            self.extract_quotes(book, pattern_matches)
 
     def assess_quote_quality(self, quote: Quote) -> QuoteQualityMetrics:
         """Assess the quality of a quote based on multiple metrics."""
         # Calculate grammatical completeness
-        sentences = re.split(r'[.!?]+', quote.text)
+        sentences = _SENTENCE_SPLIT_RE.split(quote.text)
         complete_sentences = [s for s in sentences if len(s.split()) > 3]
         grammatical_score = len(complete_sentences) / len(sentences) if sentences else 0.0
 
         # Calculate context relevance
-        context_words = set(quote.context_before.split() + quote.context_after.split())
+        context_words = set(quote.context_before.split())
+        context_words.update(quote.context_after.split())
         quote_words = set(quote.text.split())
         context_overlap = len(quote_words.intersection(context_words)) / len(quote_words)
         
         # Calculate attribution confidence based on pattern and context
         attribution_score = quote.confidence
-        if any(indicator in quote.context_before.lower() 
-               for indicator in self.speech_indicators):
+        if self._speech_indicator_re.search(quote.context_before):
             attribution_score *= 1.1
 
         # Calculate text cleanliness
-        editorial_marks = sum(1 for c in quote.text if c in '[](){}')
+        editorial_marks = sum(map(quote.text.count, '[](){}'))
         cleanliness_score = 1.0 - (editorial_marks / len(quote.text))
 
         return QuoteQualityMetrics(
@@ -607,14 +786,10 @@ class HerodotusParser:
             ), reverse=True)
             
             # Save quotes
-            quotes_file = self.data_dir / "quotes.json"
-            with open(quotes_file, "w", encoding='utf-8') as f:
-                json.dump(quotes_data, f, indent=2, ensure_ascii=False)
+            write_json(self.data_dir / "quotes.json", quotes_data)
             
             # Save debug info
-            debug_file = self.data_dir / "debug_info.json"
-            with open(debug_file, "w", encoding='utf-8') as f:
-                json.dump(dict(self.debug_info), f, indent=2, ensure_ascii=False)
+            write_json(self.data_dir / "debug_info.json", dict(self.debug_info))
             
             # Save detailed quotes file with context
             detailed_file = self.data_dir / "quotes_with_context.txt"
@@ -647,9 +822,10 @@ class QuoteDeduplicator:
     def is_duplicate(self, quote: Quote) -> bool:
         """Determines if a quote is a duplicate."""
         quote_text = quote.text.strip()
+        key = canonical_key(quote_text)
         
-        if quote_text in self.seen_quotes:
-            existing_quote = self.seen_quotes[quote_text]
+        existing_quote = self.seen_quotes.get(key)
+        if existing_quote is not None:
             
             # Same speaker and book - likely true duplicate
             if existing_quote.speaker == quote.speaker and existing_quote.book == quote.book:
@@ -673,7 +849,7 @@ class QuoteDeduplicator:
                     return True
                 else:
                     # Replace existing quote with higher confidence version
-                    self.seen_quotes[quote_text] = quote
+                    self.seen_quotes[key] = quote
                     return False
             
             # Cross-book duplicate - likely legitimate repetition
@@ -685,7 +861,7 @@ class QuoteDeduplicator:
             return False
             
         # Not a duplicate - add to seen quotes
-        self.seen_quotes[quote_text] = quote
+        self.seen_quotes[key] = quote
         return False
 
 def main():
@@ -1,98 +1,172 @@
+import hashlib
 import json
+import mmap
+import os
+import pickle
 import re
 import random
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from itertools import islice
 
-def parse_quotes_file(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+try:
+    import orjson  # Much faster indented dump when available
+except ImportError:
+    orjson = None
 
-    # Split by separator
-    blocks = content.split('--------------------------------------------------------------------------------')
-    quotes = []
-    
-    for block in blocks:
+INPUT_PATH = 'data/quotes_with_context.txt'
+OUTPUT_PATH = 'src/data/quotes.json'
+CACHE_PATH = '.cache/quotes.pkl'  # Output of the last run, keyed by cache_key()
+
+# Precompiled patterns for clean_text (run three times per selected quote);
+# whitespace is collapsed with str.split, which is faster than a third regex
+_FOOTNOTE_RE = re.compile(r'\[.*?\]')
+_STRAY_NUM_RE = re.compile(r'\s\d+\s')
+
+_SEPARATOR = b'-' * 80
+
+# Editor's notes and known narration openings, checked in one scan
+_REJECT_RE = re.compile(r'Editors read|MSS\.|^He thus inquired')
+
+# Known attribution errors: (phrase in the text, real speaker, wrong slug, right slug)
+MANUAL_FIXES = (
+    # Atys attributed to Croesus
+    ("My father, in times past the fairest", "Atys", 'croesus', 'atys'),
+    # Astyages attributed to Artembares
+    ("By what death, Harpagos", "Astyages", 'artembares', 'astyages'),
+    # Harpagos attributed to Astyages
+    ("Son of Cambyses, over thee the gods keep guard", "Harpagos", 'astyages', 'harpagos'),
+    # Tomyris attributed to Cyrus (Addressee confusion)
+    ("Cyrus, insatiable of blood", "Tomyris", 'cyrus', 'tomyris'),
+)
+_MANUAL_FIX_RE = re.compile('|'.join(re.escape(fix[0]) for fix in MANUAL_FIXES))
+
+# Field header lines in quotes_with_context.txt; any other line is body text
+_FIELD_RE = re.compile(
+    r'^(Speaker: |Book: |Quote:|Context Before:|Context After:|Pattern:|Confidence:).*$',
+    re.MULTILINE
+)
+_FIELD_NAMES = {
+    'Quote:': 'text',
+    'Context Before:': 'context_before',
+    'Context After:': 'context_after'
+}
+
+TAG_KEYWORDS = {
+    'war': ('war', 'battle', 'army', 'fight', 'spear', 'shield', 'conquer'),
+    'fate': ('fate', 'destiny', 'gods', 'oracle', 'divine', 'doom', 'fortune'),
+    'wisdom': ('wisdom', 'wise', 'counsel', 'advice', 'learn', 'know'),
+    'hubris': ('pride', 'insolence', 'wealth', 'mighty', 'king', 'power'),
+    'justice': ('justice', 'law', 'right', 'wrong', 'punish', 'vengeance'),
+    'death': ('death', 'die', 'slay', 'kill', 'bury', 'tomb')
+}
+
+# One alternation per tag; plain substrings, so 'king' still matches 'kingdom'
+_TAG_RES = {
+    tag: re.compile('|'.join(map(re.escape, words)))
+    for tag, words in TAG_KEYWORDS.items()
+}
+# Every keyword at once, to tag untouched text as 'history' in a single scan
+_ANY_TAG_RE = re.compile('|'.join(
+    re.escape(word) for words in TAG_KEYWORDS.values() for word in words
+))
+
+@dataclass(slots=True)
+class Quote:
+    """One entry of src/data/quotes.json, in output field order."""
+    id: str
+    text: str
+    speaker: str
+    book: str
+    context_before: str
+    context_after: str
+    tags: list
+
+def iter_blocks(filepath):
+    """Yields the raw bytes between separators, scanning a memory map of the file."""
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # mmap cannot map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while True:
+                end = mm.find(_SEPARATOR, pos)
+                if end == -1:
+                    yield mm[pos:]
+                    return
+                yield mm[pos:end]
+                pos = end + len(_SEPARATOR)
+
+def parse_quotes_file(filepath):
+    """Yields one dict per quote block; blocks are read and parsed one at a time."""
+    for block in iter_blocks(filepath):
+        # Only non-empty blocks get decoded
         if not block.strip():
             continue
+        block = block.decode('utf-8')
+        if '\r' in block:
+            # Text mode used to translate Windows/old Mac line endings for us
+            block = block.replace('\r\n', '\n').replace('\r', '\n')
+        block = block.strip()
             
         quote_data = {}
-        lines = block.strip().split('\n')
-        
         current_field = None
-        buffer = []
+        segments = []  # Body text of the current field, header lines excluded
+        pos = 0
         
-        for line in lines:
-            if line.startswith('Speaker: '):
-                if current_field:
-                    quote_data[current_field] = '\n'.join(buffer).strip()
-                quote_data['speaker'] = line.replace('Speaker: ', '').strip()
-                current_field = None
-                buffer = []
-            elif line.startswith('Book: '):
-                quote_data['book'] = line.replace('Book: ', '').strip()
-            elif line.startswith('Quote:'):
-                if current_field:
-                    quote_data[current_field] = '\n'.join(buffer).strip()
-                current_field = 'text'
-                buffer = []
-            elif line.startswith('Context Before:'):
-                if current_field:
-                    quote_data[current_field] = '\n'.join(buffer).strip()
-                current_field = 'context_before'
-                buffer = []
-            elif line.startswith('Context After:'):
+        for header in _FIELD_RE.finditer(block):
+            if current_field:
+                segments.append(block[pos:header.start()])
+            pos = header.end() + 1
+            label = header.group(1)
+            field = _FIELD_NAMES.get(label)
+            
+            if field:
                 if current_field:
-                    quote_data[current_field] = '\n'.join(buffer).strip()
-                current_field = 'context_after'
-                buffer = []
-            elif line.startswith('Pattern:') or line.startswith('Confidence:'):
-                continue
-            else:
+                    quote_data[current_field] = ''.join(segments).strip()
+                current_field = field
+                segments = []
+            elif label == 'Speaker: ':
                 if current_field:
-                    buffer.append(line)
+                    quote_data[current_field] = ''.join(segments).strip()
+                quote_data['speaker'] = header.group(0).replace('Speaker: ', '').strip()
+                current_field = None
+                segments = []
+            elif label == 'Book: ':
+                quote_data['book'] = header.group(0).replace('Book: ', '').strip()
+            # Pattern: and Confidence: lines are dropped
         
         if current_field:
-            quote_data[current_field] = '\n'.join(buffer).strip()
+            segments.append(block[pos:])
+            quote_data[current_field] = ''.join(segments).strip()
             
         if 'text' in quote_data and 'book' in quote_data:
-            quotes.append(quote_data)
-            
-    return quotes
+            yield quote_data
 
 def clean_text(text):
     if not text:
         return ""
-    # Remove [ ] and contents if they are footnotes like [1]
-    text = re.sub(r'\[.*?\]', '', text)
+    # Remove [ ] and contents if they are footnotes like [1]; most text has
+    # no brackets at all, and the 'in' test is far cheaper than the regex
+    if '[' in text:
+        text = _FOOTNOTE_RE.sub('', text)
     # Remove standalone numbers often used as footnotes in this text
-    text = re.sub(r'\s\d+\s', ' ', text)
+    text = _STRAY_NUM_RE.sub(' ', text)
     # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    return ' '.join(text.split())
 
 def get_tags(text, speaker):
-    tags = []
     text_lower = text.lower()
+    if not _ANY_TAG_RE.search(text_lower):
+        return ['history']
     
-    keywords = {
-        'war': ['war', 'battle', 'army', 'fight', 'spear', 'shield', 'conquer'],
-        'fate': ['fate', 'destiny', 'gods', 'oracle', 'divine', 'doom', 'fortune'],
-        'wisdom': ['wisdom', 'wise', 'counsel', 'advice', 'learn', 'know'],
-        'hubris': ['pride', 'insolence', 'wealth', 'mighty', 'king', 'power'],
-        'justice': ['justice', 'law', 'right', 'wrong', 'punish', 'vengeance'],
-        'death': ['death', 'die', 'slay', 'kill', 'bury', 'tomb']
-    }
-    
-    for tag, words in keywords.items():
-        if any(w in text_lower for w in words):
-            tags.append(tag)
-            
-    if not tags:
-        tags.append('history')
+    # Each search stops at its tag's first keyword hit
+    tags = {tag for tag, tag_re in _TAG_RES.items() if tag_re.search(text_lower)}
         
-    return list(set(tags))
+    return sorted(tags)
 
-def main():
-    raw_quotes = parse_quotes_file('data/quotes_with_context.txt')
+def build_quotes():
+    raw_quotes = parse_quotes_file(INPUT_PATH)
     
     # Filter for Book I and II
     target_quotes = [q for q in raw_quotes if q.get('book') in ['I', 'II']]
@@ -102,98 +176,128 @@ def main():
     for q in target_quotes:
         text = q.get('text', '').strip()
         
-        # Skip if text is empty
-        if not text:
+        # Skip if text is empty or too short (likely fragments); the length
+        # test is cheap, so it runs before any of the scans below
+        if len(text) < 30:
             continue
             
         # Skip if text ends with a colon (usually narration introducing a quote)
         if text.endswith(':'):
             continue
             
-        # Skip if text looks like an editor's note or garbage
-        if 'Editors read' in text or 'MSS.' in text:
-            continue
-            
-        # Skip if text is too short (likely fragments)
-        if len(text) < 30:
-            continue
-            
         # Skip if text starts with lowercase (likely continuation/fragment)
         if text[0].islower():
             continue
 
-        # Skip if text is just narration (heuristic: starts with "He", "She", "They" and no quotes inside, though this is risky)
+        # Skip if text looks like an editor's note or garbage, or is just narration
+        # (heuristic: starts with "He", "She", "They" and no quotes inside, though this is risky)
         # Better heuristic: check if it's a known bad pattern
-        if text.startswith("He thus inquired"):
+        if _REJECT_RE.search(text):
             continue
 
+        q['text'] = text  # Keep the stripped text so later passes can skip get()/strip()
         quality_quotes.append(q)
     
     # Prefer longer quotes but not massive ones
     # Sort by length to get "meaty" quotes, then shuffle or pick top
     # Let's just pick the ones with good length
-    ideal_quotes = [q for q in quality_quotes if 50 < len(q.get('text', '')) < 600]
+    # (only the first 50 are ever used, so stop filtering once we have them)
+    ideal_quotes = list(islice((q for q in quality_quotes if 50 < len(q['text']) < 600), 50))
     
     # If we don't have enough, fall back to all quality quotes
     if len(ideal_quotes) < 50:
         selected_quotes = quality_quotes[:50]
     else:
-        selected_quotes = ideal_quotes[:50]
+        selected_quotes = ideal_quotes
     
     final_quotes = []
-    speaker_counts = {}
+    speaker_counts = defaultdict(int)
     
     for q in selected_quotes:
-        clean_q_text = clean_text(q.get('text', ''))
-        clean_context_before = clean_text(q.get('context_before', ''))
-        clean_context_after = clean_text(q.get('context_after', ''))
+        clean_q_text = clean_text(q['text'])
+        # Contexts are often empty; skip the call entirely for those
+        context_before = q.get('context_before')
+        context_after = q.get('context_after')
+        clean_context_before = clean_text(context_before) if context_before else ''
+        clean_context_after = clean_text(context_after) if context_after else ''
         
         speaker = q.get('speaker', 'Unknown')
         book = q.get('book', 'I')
         
         # Generate ID
         speaker_slug = speaker.lower().replace(' ', '_')
-        count = speaker_counts.get(speaker_slug, 0) + 1
-        speaker_counts[speaker_slug] = count
+        speaker_counts[speaker_slug] += 1
+        count = speaker_counts[speaker_slug]
         quote_id = f"book{book.lower()}_{speaker_slug}_{count:02d}"
         
-        final_quotes.append({
-            "id": quote_id,
-            "text": clean_q_text,
-            "speaker": speaker,
-            "book": book,
-            "context_before": clean_context_before,
-            "context_after": clean_context_after,
-            "tags": get_tags(clean_q_text, speaker)
-        })
+        final_quotes.append(Quote(
+            id=quote_id,
+            text=clean_q_text,
+            speaker=speaker,
+            book=book,
+            context_before=clean_context_before,
+            context_after=clean_context_after,
+            tags=get_tags(clean_q_text, speaker)
+        ))
         
     # Manual fixes for known attribution errors
     for q in final_quotes:
-        # Fix Atys attributed to Croesus
-        if "My father, in times past the fairest" in q['text']:
-            q['speaker'] = "Atys"
-            # Regenerate ID
-            q['id'] = q['id'].replace('croesus', 'atys')
-            
-        # Fix Astyages attributed to Artembares
-        if "By what death, Harpagos" in q['text']:
-            q['speaker'] = "Astyages"
-            q['id'] = q['id'].replace('artembares', 'astyages')
-            
-        # Fix Harpagos attributed to Astyages
-        if "Son of Cambyses, over thee the gods keep guard" in q['text']:
-            q['speaker'] = "Harpagos"
-            q['id'] = q['id'].replace('astyages', 'harpagos')
-
-        # Fix Tomyris attributed to Cyrus (Addressee confusion)
-        if "Cyrus, insatiable of blood" in q['text']:
-            q['speaker'] = "Tomyris"
-            q['id'] = q['id'].replace('cyrus', 'tomyris')
-
-    with open('src/data/quotes.json', 'w', encoding='utf-8') as f:
-        json.dump(final_quotes, f, indent=2, ensure_ascii=False)
+        # One scan rules out the usual case where no fix applies
+        if not _MANUAL_FIX_RE.search(q.text):
+            continue
+        for phrase, speaker, old_slug, new_slug in MANUAL_FIXES:
+            if phrase in q.text:
+                q.speaker = speaker
+                # Regenerate ID
+                q.id = q.id.replace(old_slug, new_slug)
+
+    return final_quotes
+
+def render_quotes(final_quotes):
+    if orjson:
+        # orjson serializes dataclasses (slots included) natively, in field order
+        return orjson.dumps(final_quotes, option=orjson.OPT_INDENT_2)
+    return json.dumps([asdict(q) for q in final_quotes], indent=2, ensure_ascii=False).encode('utf-8')
+
+def cache_key():
+    # Hash this script too, so editing the filters or fixes invalidates the cache
+    digest = hashlib.sha256()
+    for path in (INPUT_PATH, __file__):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def load_cache(key):
+    try:
+        with open(CACHE_PATH, 'rb') as f:
+            cached_key, count, payload = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        return None
+    return (count, payload) if cached_key == key else None
+
+def save_cache(key, count, payload):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, 'wb') as f:
+            pickle.dump((key, count, payload), f, protocol=5)
+    except OSError as e:
+        print(f"Could not write cache {CACHE_PATH}: {e}")
+
+def main():
+    # Same input and same script always give the same output, so reruns reuse it
+    key = cache_key()
+    cached = load_cache(key)
+    if cached:
+        count, payload = cached
+    else:
+        final_quotes = build_quotes()
+        count, payload = len(final_quotes), render_quotes(final_quotes)
+        save_cache(key, count, payload)
+
+    with open(OUTPUT_PATH, 'wb') as f:
+        f.write(payload)
         
-    print(f"Successfully wrote {len(final_quotes)} quotes to src/data/quotes.json")
+    print(f"Successfully wrote {count} quotes to {OUTPUT_PATH}")
 
 if __name__ == "__main__":
     main()